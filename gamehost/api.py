@@ -0,0 +1,154 @@
+"""브라우저 없이 cron/CI에서 쓰는 JSON API
+
+GET  /api/games?offset=0&limit=50  게임 목록 (페이지)
+POST /api/games                    {"games": [{"dir", "container_name"?, "image"?}]}
+POST /api/games/start              {"ids": [...]} 작업 진행을 NDJSON으로 스트리밍
+POST /api/games/stop               {"ids": [...]} 작업 진행을 NDJSON으로 스트리밍
+GET  /api/games/status             실행 상태를 다시 확인하며 NDJSON으로 스트리밍
+
+GET  /games/{id}/...                실행중인 .zip 게임의 파일
+"""
+
+import asyncio
+import json
+import mimetypes
+import posixpath
+from typing import AsyncIterator
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import (
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+
+from . import archive, service
+from .database import OperationAction
+
+NDJSON = "application/x-ndjson"
+
+
+def error(message: str, status_code: int = 400) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+async def read_body(request: Request) -> dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise service.ServiceError("JSON 본문이 필요합니다.")
+    if not isinstance(body, dict):
+        raise service.ServiceError("JSON 객체가 필요합니다.")
+    return body
+
+
+async def list_games(request: Request):
+    try:
+        offset = int(request.query_params.get("offset", 0))
+        limit = int(request.query_params.get("limit", 50))
+        games, total = service.list_games(offset, limit)
+    except ValueError:
+        return error("offset과 limit은 정수여야 합니다.")
+    except service.ServiceError as e:
+        return error(str(e))
+    return JSONResponse(
+        {
+            "items": [service.game_to_dict(game) for game in games],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+    )
+
+
+async def add_games(request: Request):
+    try:
+        items = (await read_body(request)).get("games")
+        if not isinstance(items, list):
+            raise service.ServiceError("games 목록이 필요합니다.")
+    except service.ServiceError as e:
+        return error(str(e))
+    # zip 검사와 DB 커밋이 이벤트 루프(웹소켓, 작업 큐)를 막지 않도록
+    results = await asyncio.to_thread(service.add_games, items)
+    return JSONResponse({"results": results})
+
+
+async def run_operations(request: Request, action: OperationAction):
+    try:
+        ids = (await read_body(request)).get("ids")
+        if not isinstance(ids, list) or not all(
+            isinstance(id, int) and not isinstance(id, bool) for id in ids
+        ):
+            raise service.ServiceError("ids는 정수 목록이어야 합니다.")
+    except service.ServiceError as e:
+        return error(str(e))
+    return StreamingResponse(
+        ndjson(service.run_operations(ids, action)), media_type=NDJSON
+    )
+
+
+async def start_games(request: Request):
+    return await run_operations(request, OperationAction.RUN)
+
+
+async def stop_games(request: Request):
+    return await run_operations(request, OperationAction.STOP)
+
+
+async def game_statuses(request: Request):
+    return StreamingResponse(ndjson(service.refresh_statuses()), media_type=NDJSON)
+
+
+def iter_member(index: archive.ZipIndex, entry: archive.ArchiveEntry):
+    try:
+        yield from index.iter_content(entry)
+    except ValueError:
+        # 전송 도중 게임이 중지되어 압축 파일이 닫힘
+        return
+
+
+async def redirect_archive_game(request: Request):
+    # index.html의 상대 경로가 /games/{id}/ 기준으로 풀리도록
+    return RedirectResponse(f"/games/{request.path_params['id']}/")
+
+
+async def archive_game_file(request: Request):
+    """실행중인 .zip 게임의 파일을 압축을 풀지 않고 보낸다"""
+    index = archive.indexes.get(request.path_params["id"])
+    if not index:
+        return error("실행중인 압축 파일 게임이 아닙니다.", 404)
+    name = request.path_params["path"]
+    if name == "" or name.endswith("/"):
+        name += "index.html"
+    entry = index.get(posixpath.normpath(name))
+    if not entry:
+        return error(f"파일을 찾을 수 없습니다: {name}", 404)
+    content_type, _ = mimetypes.guess_type(name)
+    headers = {"Content-Length": str(entry.size)}
+    media_type = content_type or "application/octet-stream"
+    if request.method == "HEAD":
+        return Response(headers=headers, media_type=media_type)
+    return StreamingResponse(
+        iter_member(index, entry), media_type=media_type, headers=headers
+    )
+
+
+api = Starlette(
+    routes=[
+        Route("/api/games", list_games, methods=["GET"]),
+        Route("/api/games", add_games, methods=["POST"]),
+        Route("/api/games/start", start_games, methods=["POST"]),
+        Route("/api/games/stop", stop_games, methods=["POST"]),
+        Route("/api/games/status", game_statuses, methods=["GET"]),
+        Route("/games/{id:int}", redirect_archive_game, methods=["GET"]),
+        Route("/games/{id:int}/{path:path}", archive_game_file, methods=["GET"]),
+    ]
+)
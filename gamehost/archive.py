@@ -0,0 +1,134 @@
+import mmap
+import posixpath
+import struct
+import threading
+import zipfile
+import zlib
+from typing import NamedTuple
+
+ARCHIVE_EXTENSIONS = (".zip",)
+CHUNK_SIZE = 64 * 1024
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+class ArchiveEntry(NamedTuple):
+    offset: int  # 로컬 헤더 뒤 실제 데이터 위치
+    compressed_size: int
+    size: int
+    method: int
+
+
+def is_archive(path: str) -> bool:
+    """확장자로만 판단, 파일이 없어져도 압축 파일 게임으로 취급한다"""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+class ZipIndex:
+    """zip의 central directory를 한 번만 읽어 만든 조회 테이블
+
+    압축을 풀지 않고 mmap에서 오프셋으로 바로 멤버를 읽는다.
+    index.html이 들어있는 가장 얕은 폴더를 게임 루트로 사용한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(self._file) as zf:
+                infos = [
+                    info
+                    for info in zf.infolist()
+                    if not info.is_dir()
+                    and not info.flag_bits & 0x1  # 암호화된 항목은 제외
+                    and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+                ]
+            self.root = self._find_root([info.filename for info in infos])
+            self.entries: dict[str, ArchiveEntry] = {}
+            for info in infos:
+                if not info.filename.startswith(self.root):
+                    continue
+                name = info.filename[len(self.root) :]
+                self.entries[name] = ArchiveEntry(
+                    self._data_offset(info.header_offset),
+                    info.compress_size,
+                    info.file_size,
+                    info.compress_type,
+                )
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _find_root(names: list[str]) -> str:
+        roots = [
+            name[: -len("index.html")]
+            for name in names
+            if posixpath.basename(name) == "index.html"
+        ]
+        if not roots:
+            raise ValueError("'index.html' 파일이 압축 파일에 없습니다.")
+        return min(roots, key=lambda root: (root.count("/"), len(root)))
+
+    def _data_offset(self, header_offset: int) -> int:
+        header = LOCAL_HEADER.unpack_from(self._mmap, header_offset)
+        if header[0] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"잘못된 로컬 헤더: {header_offset}")
+        name_length, extra_length = header[-2], header[-1]
+        return header_offset + LOCAL_HEADER.size + name_length + extra_length
+
+    def get(self, name: str) -> ArchiveEntry | None:
+        return self.entries.get(name)
+
+    def iter_content(self, entry: ArchiveEntry):
+        """멤버 내용을 조각으로 반환, 무압축 항목은 재압축 없이 그대로 넘긴다
+
+        mmap을 슬라이스해 bytes로 복사하므로 읽는 중에도 close()할 수 있다.
+        닫힌 뒤에 읽으면 ValueError가 발생한다.
+        """
+        end = entry.offset + entry.compressed_size
+        decompressor = None
+        if entry.method == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        for start in range(entry.offset, end, CHUNK_SIZE):
+            chunk = self._mmap[start : min(start + CHUNK_SIZE, end)]
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            if chunk:
+                yield chunk
+        if decompressor and (chunk := decompressor.flush()):
+            yield chunk
+
+    def close(self):
+        try:
+            if mmap_ := getattr(self, "_mmap", None):
+                mmap_.close()
+        finally:
+            self._file.close()
+
+
+# game id -> 실행중인 압축 파일 게임의 조회 테이블, api의 /games/{id}/ 에서 사용
+indexes: dict[int, ZipIndex] = {}
+indexes_lock = threading.Lock()
+
+
+def serve(game_id: int, path: str):
+    """압축 파일을 열어 /games/{game_id}/ 에서 서비스되도록 등록"""
+    index = ZipIndex(path)
+    with indexes_lock:
+        previous = indexes.pop(game_id, None)
+        indexes[game_id] = index
+    if previous:
+        previous.close()
+
+
+def shutdown(game_id: int):
+    with indexes_lock:
+        index = indexes.pop(game_id, None)
+    if index:
+        index.close()
+
+
+def is_serving(game_id: int) -> bool:
+    return game_id in indexes
@@ -0,0 +1,146 @@
+"""gamehost 명령줄 도구
+
+백엔드의 /api 를 호출하므로 실행/중지 작업은 백엔드의 작업 큐 하나에서만 처리된다.
+
+    python -m gamehost list --limit 100
+    python -m gamehost add /games/a/www /games/b.zip
+    python -m gamehost start 1 2 3
+    python -m gamehost stop --all
+    python -m gamehost status
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from typing import Iterator
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+PAGE_SIZE = 500
+
+
+class Client:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def request(self, method: str, path: str, body: dict | None = None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            return urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read() or b"{}").get("error") or e.reason
+            except (ValueError, AttributeError):
+                # Starlette의 기본 500 응답처럼 JSON 객체가 아닌 본문
+                message = e.reason
+            raise SystemExit(f"오류: {e.code} {message}")
+        except urllib.error.URLError as e:
+            raise SystemExit(f"{self.url}에 연결할 수 없습니다: {e.reason}")
+
+    def json(self, method: str, path: str, body: dict | None = None) -> dict:
+        with self.request(method, path, body) as response:
+            return json.load(response)
+
+    def stream(self, method: str, path: str, body: dict | None = None) -> Iterator[dict]:
+        with self.request(method, path, body) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_games(self, offset: int = 0, limit: int | None = None) -> Iterator[dict]:
+        while limit is None or limit > 0:
+            page_size = PAGE_SIZE if limit is None else min(limit, PAGE_SIZE)
+            page = self.json("GET", f"/api/games?offset={offset}&limit={page_size}")
+            yield from page["items"]
+            offset += len(page["items"])
+            if limit is not None:
+                limit -= len(page["items"])
+            if not page["items"] or offset >= page["total"]:
+                return
+
+
+def emit(row: dict):
+    print(json.dumps(row, ensure_ascii=False), flush=True)
+
+
+def list_games(client: Client, args: argparse.Namespace) -> int:
+    for game in client.iter_games(args.offset, args.limit):
+        emit(game)
+    return 0
+
+
+def add_games(client: Client, args: argparse.Namespace) -> int:
+    if args.name and len(args.dirs) > 1:
+        raise SystemExit("--name은 게임을 하나만 추가할 때 쓸 수 있습니다.")
+    games = [
+        {"dir": os.path.abspath(dir), "container_name": args.name, "image": args.image}
+        for dir in args.dirs
+    ]
+    failed = False
+    for result in client.json("POST", "/api/games", {"games": games})["results"]:
+        failed |= "error" in result
+        emit(result)
+    return 1 if failed else 0
+
+
+def run_operations(client: Client, args: argparse.Namespace) -> int:
+    ids = args.ids
+    if args.all:
+        ids = [game["id"] for game in client.iter_games()]
+    if not ids:
+        raise SystemExit("게임 id나 --all이 필요합니다.")
+    failed = False
+    for row in client.stream("POST", f"/api/games/{args.command}", {"ids": ids}):
+        failed |= row["status"] == "FAILED"
+        emit(row)
+    return 1 if failed else 0
+
+
+def game_statuses(client: Client, args: argparse.Namespace) -> int:
+    for game in client.stream("GET", "/api/games/status"):
+        emit(game)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="gamehost", description=__doc__.split("\n")[0])
+    parser.add_argument("--url", default=BACKEND_URL, help="백엔드 주소 (BACKEND_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="게임 목록")
+    list_parser.add_argument("--offset", type=int, default=0)
+    list_parser.add_argument("--limit", type=int, default=None)
+    list_parser.set_defaults(handler=list_games)
+
+    add_parser = commands.add_parser("add", help="게임 폴더나 .zip 추가")
+    add_parser.add_argument("dirs", nargs="+")
+    add_parser.add_argument("--name", help="컨테이너 이름 (기본: 폴더/파일 이름)")
+    add_parser.add_argument("--image", help="도커 이미지")
+    add_parser.set_defaults(handler=add_games)
+
+    for command, help in (("start", "게임 실행"), ("stop", "게임 중지")):
+        operation_parser = commands.add_parser(command, help=help)
+        operation_parser.add_argument("ids", nargs="*", type=int)
+        operation_parser.add_argument("--all", action="store_true")
+        operation_parser.set_defaults(handler=run_operations)
+
+    status_parser = commands.add_parser("status", help="실행 상태 다시 확인")
+    status_parser.set_defaults(handler=game_statuses)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(Client(args.url), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+import struct
+import subprocess
+import time
+import zipfile
+
+from reflex.utils.compat import sqlmodel
+
+from . import archive
+from .database import Game, GameStatus
+
+PORT_ERRORS = [
+    "ports are not available",
+    "port is already allocated",
+    "already in use",
+]
+CONTAINER_NAME_ERRORS = ["Conflict. The container name"]
+# 포트 충돌이 계속되면 무한히 재귀하지 않도록 시도 횟수를 제한
+MAX_PORT_RETRIES = 20
+
+
+class ContainerError(Exception):
+    """도커 명령이 실패했을 때 발생"""
+
+
+def docker(*args: str, deadline: float | None = None) -> subprocess.CompletedProcess:
+    """deadline(time.monotonic 기준)까지 남은 시간을 명령의 timeout으로 사용"""
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise subprocess.TimeoutExpired(["docker", *args], 0)
+    return subprocess.run(
+        ["docker", *args], capture_output=True, text=True, timeout=timeout
+    )
+
+
+def running_containers(
+    name: str | None = None, deadline: float | None = None
+) -> set[str]:
+    """실행중인 컨테이너 이름들, 여러 게임을 확인할 때는 한 번만 호출해 재사용"""
+    filters = ["--filter", f"name={name}"] if name else []
+    docker_ps = docker("ps", *filters, "--format", "{{.Names}}", deadline=deadline)
+    if docker_ps.returncode != 0:
+        return set()
+    return set(docker_ps.stdout.splitlines())
+
+
+def is_running(
+    game: Game, deadline: float | None = None, running: set[str] | None = None
+) -> bool:
+    "컨테이너가 없거나 실행중이지 않으면 False, 실행중이면 True"
+    if archive.is_archive(game.dir):
+        return game.id is not None and archive.is_serving(game.id)
+    if running is None:
+        running = running_containers(game.container_name, deadline=deadline)
+    return game.container_name in running
+
+
+def refresh_status(
+    session: sqlmodel.Session, game: Game, running: set[str] | None = None
+) -> None:
+    game.status = (
+        GameStatus.RUNNING if is_running(game, running=running) else GameStatus.STOPPED
+    )
+    session.add(game)
+    session.commit()
+
+
+def run_container(
+    session: sqlmodel.Session, game: Game, deadline: float | None = None
+) -> None:
+    """컨테이너를 실행, 포트나 이름이 충돌하면 정리 후 다시 시도"""
+    if archive.is_archive(game.dir):
+        return run_archive(session, game)
+    if not os.path.isdir(game.dir):
+        # 없는 경로를 -v로 넘기면 도커가 빈 폴더를 만들어 버린다
+        raise ContainerError(f"게임 폴더를 찾을 수 없습니다: {game.dir}")
+    for _ in range(MAX_PORT_RETRIES):
+        process = docker(
+            "run",
+            "-it",
+            "--init",
+            "-v",
+            f"{game.dir}:/game",
+            "-p",
+            f"{game.port}:3000",
+            "--name",
+            game.container_name,
+            "-e",
+            "DEBUG=true",
+            "-d",
+            game.image,
+            deadline=deadline,
+        )
+        print(process)
+        if process.returncode == 0:
+            game.status = GameStatus.RUNNING
+            session.add(game)
+            session.commit()
+            return
+        if any(err in process.stderr for err in PORT_ERRORS):
+            docker("rm", "-f", game.container_name, deadline=deadline)
+            game.port += 1
+            session.add(game)
+            session.commit()
+            continue
+        if any(err in process.stderr for err in CONTAINER_NAME_ERRORS):
+            docker("rm", "-f", game.container_name, deadline=deadline)
+            continue
+        raise ContainerError(process.stderr.strip())
+    raise ContainerError(f"사용 가능한 포트를 찾을 수 없습니다: {game.port}")
+
+
+def run_archive(session: sqlmodel.Session, game: Game) -> None:
+    """압축 파일 게임은 도커 대신 백엔드의 /games/{id}/ 에서 압축을 풀지 않고 서비스"""
+    if not os.path.isfile(game.dir):
+        raise ContainerError(f"압축 파일을 찾을 수 없습니다: {game.dir}")
+    assert game.id is not None
+    try:
+        archive.serve(game.id, game.dir)
+    except (zipfile.BadZipFile, ValueError, struct.error, OSError) as e:
+        raise ContainerError(f"{game.dir}: {e}")
+    game.status = GameStatus.RUNNING
+    session.add(game)
+    session.commit()
+
+
+def stop_container(
+    session: sqlmodel.Session, game: Game, deadline: float | None = None
+) -> None:
+    if archive.is_archive(game.dir):
+        if game.id is not None:
+            archive.shutdown(game.id)
+        game.status = GameStatus.STOPPED
+        session.add(game)
+        session.commit()
+        return
+    process = docker("rm", "-f", game.container_name, deadline=deadline)
+    if process.returncode != 0:
+        raise ContainerError(
+            f"도커 컨테이너를 중지할 수 없습니다: {process.stderr.strip()}"
+        )
+    game.status = GameStatus.STOPPED
+    session.add(game)
+    session.commit()
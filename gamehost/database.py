@@ -1,5 +1,6 @@
 from typing import Literal
 import reflex as rx
+import sqlalchemy as sa
 from redis.asyncio import Redis
 
 import enum
@@ -12,8 +13,35 @@ class GameStatus(enum.Enum):
 
 
 class Game(rx.Model, table=True):
+    # 게임 폴더 또는 .zip 압축 파일 경로
     dir: str
     port: int
     container_name: str
     status: GameStatus = GameStatus.NOTCREATED
     image: str = "farrar142/mvix"
+
+
+class OperationAction(enum.Enum):
+    RUN = "RUN"
+    STOP = "STOP"
+
+
+class OperationStatus(enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class GameOperation(rx.Model, table=True):
+    # enqueue와 작업 처리에서 게임별 대기/실행중 작업을 찾을 때 사용
+    __table_args__ = (
+        sa.Index("ix_gameoperation_game_id_status", "game_id", "status"),
+    )
+
+    game_id: int
+    action: OperationAction
+    status: OperationStatus = OperationStatus.PENDING
+    attempts: int = 0
+    error: str = ""
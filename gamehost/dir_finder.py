@@ -1,10 +1,12 @@
 import reflex as rx
 from reflex.utils.compat import sqlmodel
-import os, subprocess
+import os
 import pathlib
 from typing import List
 
-from .database import Game, GameStatus
+from . import archive, container, service
+from .database import Game, GameStatus, OperationAction, OperationStatus
+from .operations import operation_queue
 from redis.asyncio import Redis
 
 # db = GameDatabase(redis=Redis(host="192.168.0.14"))
@@ -12,7 +14,7 @@ from redis.asyncio import Redis
 
 class Config(rx.State):
     container_name: str = "my_container"
-    image: str = "farrar142/mvix"
+    image: str = service.DEFAULT_IMAGE
 
     @rx.event
     def set_container_name(self, name: str):
@@ -31,10 +33,12 @@ class Games(rx.State):
         with rx.session() as session:
             async with self:
                 self.games = [*session.exec(Game.select()).all()]
+                # 게임마다 docker ps를 실행하지 않도록 한 번만 조회
+                running = container.running_containers()
                 for game in self.games:
                     if not game.id:
                         continue
-                    await self.set_game_status(session, game.id)
+                    await self.set_game_status(session, game.id, running)
 
     @rx.event(background=True)
     async def load_games(self):
@@ -44,147 +48,79 @@ class Games(rx.State):
 
     @rx.event(background=True)
     async def add_game(self, dir: str):
-        # dir하위에 www폴더가 있는지 확인
-        if not os.path.exists(os.path.join(dir, "index.html")):
-            # DirectoryState의 에러 메세지로 변경
-            async with self:
-                directory = await self.get_state(DirectoryState)
-                directory.error_message = f"'index.html' 파일이{dir}에 없습니다."
-                return
+        async with self:
+            config = await self.get_state(Config)
+            container_name, image = config.container_name, config.image
 
         with rx.session() as session:
-            port = 3000
-            if last_game := session.exec(
-                Game.select().order_by(Game.port.desc())
-            ).first():
-                port = last_game.port + 1
+            try:
+                # 경로 검사는 service.add_game 안에서 한 번만
+                game = service.add_game(session, dir, container_name, image)
+            except service.ServiceError as e:
+                # DirectoryState의 에러 메세지로 변경
+                async with self:
+                    directory = await self.get_state(DirectoryState)
+                    directory.error_message = str(e)
+                    return
             async with self:
-                config = await self.get_state(Config)
-                game = Game(
-                    dir=dir,
-                    port=port,
-                    container_name=config.container_name,
-                    image=config.image,
-                )
-                session.add(game)
-                session.commit()
-                self.games.append(game)
+                # 이미 추가된 경로면 기존 게임이 반환된다
+                if all(g.id != game.id for g in self.games):
+                    self.games.append(game)
 
     @rx.event(background=True)
     async def delete_game(self, id: int):
         with rx.session() as session:
             game = session.get(Game, id)
             if game:
+                operation_queue.cancel_pending(id)
+                if archive.is_archive(game.dir):
+                    # 삭제 후에는 서비스를 멈출 방법이 없으므로 먼저 닫는다
+                    archive.shutdown(id)
                 session.delete(game)
                 session.commit()
                 async with self:
                     self.games = [g for g in self.games if g.id != id]
 
-    async def set_game_status(self, session: sqlmodel.Session, id: int) -> bool:
+    async def set_game_status(
+        self, session: sqlmodel.Session, id: int, running: set[str] | None = None
+    ) -> bool:
         game = session.get(Game, id)
         if not game:
             return False
-        "도커 컨테이너의 실행 상태를 반환합니다, 컨테이너가 없으면 False, 실행중이지 않으면 False, 실행중이면 True"
-        docker_ps = subprocess.run(
-            [
-                "docker",
-                "ps",
-                "--filter",
-                f"name={game.container_name}",
-                "--format",
-                "{{.Names}}",
-            ],
-            capture_output=True,
-            text=True,
-        )
-        if docker_ps.returncode != 0:
-            game.status = GameStatus.STOPPED
-        elif game.container_name in docker_ps.stdout.splitlines():
-            game.status = GameStatus.RUNNING
-        else:
-            game.status = GameStatus.STOPPED
-        session.add(game)
-        session.commit()
+        container.refresh_status(session, game, running)
         return True
 
-    @rx.event(background=True)
-    async def run_game(self, id: int):
+    async def run_operation(self, id: int, action: OperationAction):
+        """작업 큐에 등록하고 끝나면 게임 목록을 갱신, 중복 클릭은 큐에서 합쳐진다"""
+        operation_id = operation_queue.enqueue(id, action)
+        operation = await operation_queue.wait(operation_id)
+        if operation and operation.status == OperationStatus.FAILED:
+            print(f"작업 실패: {operation.error}")
         with rx.session() as session:
-            print("run game")
-            game = next((g for g in self.games if g.id == id), None)
-            if not game:
-                print("게임을 찾을 수 없습니다.")
-                return
-
-            print(
-                f"Running game with ID: {id} and port: {game.port} and status {game.status}"
-            )
+            async with self:
+                self.games = [*session.exec(Game.select()).all()]
 
-            async def inner():
-                docker_run = f"docker run -it --init -v {game.dir}:/game -p {game.port}:3000 --name {game.container_name} -e DEBUG=true -d {game.image}"
-                process = subprocess.run(
-                    docker_run.split(), capture_output=True, text=True
-                )
-                print(process)
-                if process.returncode == 0:
-
-                    async with self:
-                        game.status = GameStatus.RUNNING
-                        session.add(game)
-                        session.commit()
-                else:
-                    port_errors = [
-                        "ports are not available",
-                        "port is already allocated",
-                        "already in use",
-                    ]
-                    if any(err in process.stderr for err in port_errors):
-
-                        docker_stop = f"docker rm -f {game.container_name}"
-                        process = subprocess.run(
-                            docker_stop.split(), capture_output=True, text=True
-                        )
-                        async with self:
-                            game.port += 1
-                            session.add(game)
-                            session.commit()
-                        await inner()
-                    container_name_errors = ["Conflict. The container name"]
-                    if any(err in process.stderr for err in container_name_errors):
-                        docker_stop = f"docker rm -f {game.container_name}"
-                        process = subprocess.run(
-                            docker_stop.split(), capture_output=True, text=True
-                        )
-                        await inner()
-
-            await inner()
+    @rx.event(background=True)
+    async def run_game(self, id: int):
+        print("run game")
+        await self.run_operation(id, OperationAction.RUN)
 
     @rx.event(background=True)
     async def stop_game(self, id: int):
-        with rx.session() as session:
-            print("stop game")
-            game = next((g for g in self.games if g.id == id), None)
-            if not game:
-                print("게임을 찾을 수 없습니다.")
-                return
-            async with self:
-
-                print(
-                    f"Stopping game with ID: {id} and port: {game.port} and status {game.status}"
-                )
-                docker_stop = f"docker rm -f {game.container_name}"
-                process = subprocess.run(
-                    docker_stop.split(), capture_output=True, text=True
-                )
-                if process.returncode == 0:
-                    game.status = GameStatus.STOPPED
-                    session.add(game)
-                    session.commit()
-                else:
-                    print("도커 컨테이너를 중지할 수 없습니다.")
+        print("stop game")
+        await self.run_operation(id, OperationAction.STOP)
 
     @rx.event
-    def move_to_url(self, port: int):
+    def move_to_url(self, id: int):
+        game = next((g for g in self.games if g.id == id), None)
+        if not game:
+            return
+        if archive.is_archive(game.dir):
+            # 압축 파일 게임은 백엔드의 /games/{id}/ 에서 서비스된다
+            return rx.call_script(
+                f"window.open('{rx.config.get_config().api_url}/games/{id}/', '_blank')"
+            )
+        port = game.port
         # 주소창의 호스트 가져오기 127.0.0.1:3000으로 들어가면 127.0.0.1이 나오도록, 192.168.0.14:3000으로 들어가면 192.168.0.14가 나오도록
         # callscript가 작동 안해
         print("call")
@@ -239,10 +175,9 @@ class DirectoryState(rx.State):
                     self.directories = dirs
                     self.files = files
                     config = await self.get_state(Config)
-                    if self.current_path.endswith("www"):
-                        config.set_container_name(self.current_path.split(os.sep)[-2])
-                    else:
-                        config.set_container_name(self.current_path.split(os.sep)[-1])
+                    config.set_container_name(
+                        service.default_container_name(self.current_path)
+                    )
 
                 except PermissionError:
                     self.error_message = f"권한이 없습니다: {self.current_path}"
@@ -303,6 +238,16 @@ class DirectoryState(rx.State):
         except Exception as e:
             self.error_message = f"디렉토리 이동 중 오류: {str(e)}"
 
+    @rx.event
+    async def select_file(self, file_name: str):
+        """압축 파일을 선택하면 게임으로 추가"""
+        path = os.path.join(self.current_path, file_name)
+        if not archive.is_archive(path):
+            return
+        config = await self.get_state(Config)
+        config.set_container_name(service.default_container_name(path))
+        yield Games.add_game(path)
+
     @rx.event
     async def set_selected_directory(self, directory_name: str):
         """선택된 디렉토리 설정 후 이동"""
@@ -398,7 +343,7 @@ def index() -> rx.Component:
                                         rx.text(game.container_name, weight="bold"),
                                         rx.text(f"포트: {game.port}"),
                                         align="center",
-                                        on_click=lambda: Games.move_to_url(game.port),
+                                        on_click=lambda: Games.move_to_url(game.id),
                                     ),
                                     rx.text(game.image),
                                     rx.hstack(
@@ -504,6 +449,9 @@ def index() -> rx.Component:
                                         border_radius="md",
                                         margin_bottom="5px",
                                         width="100%",
+                                        cursor="pointer",
+                                        _hover={"background_color": "blue.50"},
+                                        on_click=DirectoryState.select_file(file_name),
                                     ),
                                 ),
                                 width="100%",
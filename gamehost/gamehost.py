@@ -3,8 +3,15 @@
 import reflex as rx
 from rxconfig import config
 
+from .api import api
 from .dir_finder import index
+from .operations import operation_queue
+from .service import restore_archive_games
 
 
-app = rx.App()
+# /api/* 는 UI 상태 없이 JSON으로 처리
+app = rx.App(api_transformer=api)
 app.add_page(index)
+# 재시작 전에 끝나지 않은 실행/중지 작업을 이어서 처리
+app.register_lifespan_task(operation_queue.resume)
+app.register_lifespan_task(restore_archive_games)
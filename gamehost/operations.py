@@ -0,0 +1,314 @@
+import asyncio
+import subprocess
+import time
+
+import reflex as rx
+import sqlalchemy as sa
+from reflex.utils.compat import sqlmodel
+
+from . import container
+from .database import (
+    Game,
+    GameOperation,
+    GameStatus,
+    OperationAction,
+    OperationStatus,
+)
+
+MAX_WORKERS = 4
+MAX_ATTEMPTS = 3
+# 작업 하나가 재시도를 포함해 끝나야 하는 최대 시간(초)
+OPERATION_TIMEOUT = 300
+RETRY_DELAY = 1.0
+# 게임마다 남겨둘 끝난 작업 수, 나머지는 삭제
+KEEP_FINISHED = 20
+
+FINISHED = (OperationStatus.DONE, OperationStatus.FAILED, OperationStatus.CANCELLED)
+
+
+class OperationQueue:
+    """게임별로 직렬화된 실행/중지 작업 큐
+
+    작업은 SQLite(GameOperation)에 저장되어 백엔드가 재시작되어도 이어서 처리된다.
+    게임마다 대기중인 작업은 최대 하나만 유지한다.
+    같은 요청이 다시 오면 대기/실행중인 기존 작업을 그대로 쓰고,
+    반대 요청이 실행 전에 오면 최신 요청이 이긴다.
+    이미 원하는 상태인 게임에는 도커 명령을 실행하지 않는다.
+    """
+
+    def __init__(
+        self,
+        workers: int = MAX_WORKERS,
+        max_attempts: int = MAX_ATTEMPTS,
+        timeout: float = OPERATION_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self._semaphore: asyncio.Semaphore | None = None
+        # game_id -> 해당 게임의 작업을 순서대로 처리하는 태스크
+        self._drainers: dict[int, asyncio.Task] = {}
+        # operation id -> 작업 완료 이벤트
+        self._events: dict[int, asyncio.Event] = {}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._semaphore
+
+    def enqueue(self, game_id: int, action: OperationAction) -> int:
+        """작업을 등록하고 요청한 action의 작업 id를 반환
+
+        같은 요청이 대기/실행중이면 그 작업으로 합쳐진다.
+        반대 요청이 대기중이면 최신 요청이 이긴다. 대기 작업은 취소하고,
+        그 작업이 상태를 바꿀 예정이었다면(실행 전 실행+중지) 할 일이 없으므로
+        새 요청은 도커 작업 없이 바로 DONE으로 기록한다.
+        """
+        cancelled_id = None
+        with rx.session() as session:
+            pending = session.exec(
+                GameOperation.select()
+                .where(GameOperation.game_id == game_id)
+                .where(GameOperation.status == OperationStatus.PENDING)
+                .order_by(GameOperation.id)
+            ).first()
+            if pending and pending.id and pending.action == action:
+                return pending.id
+            if pending and pending.id:
+                pending.status = OperationStatus.CANCELLED
+                session.add(pending)
+                cancelled_id = pending.id
+                game = session.get(Game, game_id)
+                if game and self._is_target(game.status, action):
+                    # 게임은 이미 요청한 상태, 두 요청 모두 할 일이 없다
+                    operation = GameOperation(
+                        game_id=game_id, action=action, status=OperationStatus.DONE
+                    )
+                    return self._commit_new(session, operation, cancelled_id)
+            running = session.exec(
+                GameOperation.select()
+                .where(GameOperation.game_id == game_id)
+                .where(GameOperation.status == OperationStatus.RUNNING)
+            ).first()
+            if running and running.id and running.action == action:
+                # 이미 같은 작업이 실행중
+                session.commit()
+                if cancelled_id:
+                    self._finish(cancelled_id)
+                return running.id
+            operation_id = self._commit_new(
+                session, GameOperation(game_id=game_id, action=action), cancelled_id
+            )
+        self._schedule(game_id)
+        return operation_id
+
+    def _commit_new(
+        self,
+        session: sqlmodel.Session,
+        operation: GameOperation,
+        cancelled_id: int | None,
+    ) -> int:
+        session.add(operation)
+        session.commit()
+        session.refresh(operation)
+        assert operation.id is not None
+        if cancelled_id:
+            self._finish(cancelled_id)
+        return operation.id
+
+    @staticmethod
+    def _is_target(status: GameStatus, action: OperationAction) -> bool:
+        """게임이 이미 action이 만들려는 상태인지"""
+        return (status == GameStatus.RUNNING) == (action == OperationAction.RUN)
+
+    def cancel_pending(self, game_id: int) -> None:
+        """게임의 대기중인 작업을 모두 취소"""
+        with rx.session() as session:
+            pending = session.exec(
+                GameOperation.select()
+                .where(GameOperation.game_id == game_id)
+                .where(GameOperation.status == OperationStatus.PENDING)
+            ).all()
+            for operation in pending:
+                operation.status = OperationStatus.CANCELLED
+                session.add(operation)
+            session.commit()
+            for operation in pending:
+                if operation.id:
+                    self._finish(operation.id)
+
+    async def wait(self, operation_id: int) -> GameOperation | None:
+        """작업이 끝날 때까지 기다린 뒤 작업을 반환"""
+        event = self._events.setdefault(operation_id, asyncio.Event())
+        with rx.session() as session:
+            operation = session.get(GameOperation, operation_id)
+            if not operation or operation.status in FINISHED:
+                self._events.pop(operation_id, None)
+                return operation
+        await event.wait()
+        with rx.session() as session:
+            return session.get(GameOperation, operation_id)
+
+    async def resume(self):
+        """백엔드 재시작 시 끝나지 않은 작업을 다시 처리"""
+        with rx.session() as session:
+            unfinished = session.exec(
+                GameOperation.select().where(
+                    GameOperation.status.in_(  # type: ignore
+                        [OperationStatus.PENDING, OperationStatus.RUNNING]
+                    )
+                )
+            ).all()
+            game_ids = set()
+            for operation in unfinished:
+                # 실행 도중 중단된 작업은 다시 대기 상태로
+                operation.status = OperationStatus.PENDING
+                session.add(operation)
+                game_ids.add(operation.game_id)
+            session.commit()
+            finished_game_ids = session.exec(
+                sa.select(GameOperation.game_id)
+                .where(GameOperation.status.in_(FINISHED))  # type: ignore
+                .distinct()
+            ).all()
+            for game_id in finished_game_ids:
+                self._prune(session, game_id)
+            session.commit()
+        for game_id in game_ids:
+            self._schedule(game_id)
+
+    @staticmethod
+    def _prune(session, game_id: int):
+        """게임의 끝난 작업 중 최근 KEEP_FINISHED개만 남긴다"""
+        oldest_kept = session.exec(
+            sa.select(GameOperation.id)
+            .where(GameOperation.game_id == game_id)
+            .where(GameOperation.status.in_(FINISHED))  # type: ignore
+            .order_by(GameOperation.id.desc())  # type: ignore
+            .offset(KEEP_FINISHED - 1)
+            .limit(1)
+        ).first()
+        if oldest_kept is None:
+            return
+        session.execute(
+            sa.delete(GameOperation)
+            .where(GameOperation.game_id == game_id)
+            .where(GameOperation.status.in_(FINISHED))  # type: ignore
+            .where(GameOperation.id < oldest_kept)
+        )
+
+    def _schedule(self, game_id: int):
+        drainer = self._drainers.get(game_id)
+        if drainer and not drainer.done():
+            return
+        self._drainers[game_id] = asyncio.create_task(self._drain(game_id))
+
+    def _finish(self, operation_id: int):
+        if event := self._events.pop(operation_id, None):
+            event.set()
+
+    async def _drain(self, game_id: int):
+        while True:
+            with rx.session() as session:
+                operation = session.exec(
+                    GameOperation.select()
+                    .where(GameOperation.game_id == game_id)
+                    .where(GameOperation.status == OperationStatus.PENDING)
+                    .order_by(GameOperation.id)
+                ).first()
+                if not operation or not operation.id:
+                    # await 없이 빠져나가므로 enqueue와 경쟁하지 않음
+                    self._drainers.pop(game_id, None)
+                    return
+                operation_id = operation.id
+            async with self.semaphore:
+                try:
+                    await self._process(operation_id)
+                except Exception as e:
+                    # DB 오류 등으로 같은 작업을 계속 다시 잡지 않도록 멈추고,
+                    # 다음 enqueue 때 다시 시작한다
+                    print(f"작업 {operation_id} 처리 중 오류: {e}")
+                    self._drainers.pop(game_id, None)
+                    return
+
+    async def _process(self, operation_id: int):
+        with rx.session() as session:
+            operation = session.get(GameOperation, operation_id)
+            # 세마포어를 기다리는 동안 취소되었을 수 있음
+            if not operation or operation.status != OperationStatus.PENDING:
+                return
+            operation.status = OperationStatus.RUNNING
+            session.add(operation)
+            session.commit()
+            action = operation.action
+            game_id = operation.game_id
+
+        status = OperationStatus.FAILED
+        error = ""
+        attempts = 0
+        deadline = time.monotonic() + self.timeout
+        try:
+            while attempts < self.max_attempts:
+                attempts += 1
+                try:
+                    await asyncio.to_thread(self._execute, game_id, action, deadline)
+                    status = OperationStatus.DONE
+                    error = ""
+                    break
+                except LookupError as e:
+                    error = str(e)
+                    break
+                except subprocess.TimeoutExpired:
+                    error = f"작업이 {self.timeout}초 안에 끝나지 않았습니다."
+                except container.ContainerError as e:
+                    error = str(e)
+                except Exception as e:
+                    # 도커가 없거나 실행 중 게임이 삭제된 경우 등
+                    error = f"{type(e).__name__}: {e}"
+                print(
+                    f"작업 {operation_id} 실패 ({attempts}/{self.max_attempts}): {error}"
+                )
+                delay = RETRY_DELAY * attempts
+                if time.monotonic() + delay >= deadline:
+                    break
+                if attempts < self.max_attempts:
+                    await asyncio.sleep(delay)
+        finally:
+            # 어떤 경우에도 RUNNING으로 남지 않도록 결과를 기록하고 대기자를 깨운다
+            try:
+                with rx.session() as session:
+                    operation = session.get(GameOperation, operation_id)
+                    if operation:
+                        operation.status = status
+                        operation.attempts = attempts
+                        operation.error = error
+                        session.add(operation)
+                        self._prune(session, operation.game_id)
+                        session.commit()
+            finally:
+                self._finish(operation_id)
+
+    def _execute(self, game_id: int, action: OperationAction, deadline: float):
+        with rx.session() as session:
+            game = session.get(Game, game_id)
+            if not game:
+                raise LookupError("게임을 찾을 수 없습니다.")
+            print(
+                f"{action.value} game with ID: {game_id} and port: {game.port} and status {game.status}"
+            )
+            running = container.is_running(game, deadline=deadline)
+            if running == (action == OperationAction.RUN):
+                # 이미 원하는 상태면 도커 작업 없이 상태만 맞춘다
+                # (실행중인 게임을 다시 실행하면 컨테이너가 재시작되어 접속이 끊긴다)
+                game.status = GameStatus.RUNNING if running else GameStatus.STOPPED
+                session.add(game)
+                session.commit()
+                return
+            if action == OperationAction.RUN:
+                container.run_container(session, game, deadline=deadline)
+            else:
+                container.stop_container(session, game, deadline=deadline)
+
+
+operation_queue = OperationQueue()
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import pathlib
+import struct
+import zipfile
+from typing import AsyncIterator
+
+import reflex as rx
+from reflex.utils.compat import sqlmodel
+
+from . import archive, container
+from .database import (
+    Game,
+    GameOperation,
+    GameStatus,
+    OperationAction,
+    OperationStatus,
+)
+from .operations import operation_queue
+
+DEFAULT_IMAGE = "farrar142/mvix"
+DEFAULT_PORT = 3000
+MAX_PAGE_SIZE = 500
+
+
+class ServiceError(Exception):
+    """잘못된 요청일 때 발생, 메세지는 사용자에게 그대로 보여준다"""
+
+
+def game_to_dict(game: Game) -> dict:
+    return {
+        "id": game.id,
+        "dir": game.dir,
+        "port": game.port,
+        "container_name": game.container_name,
+        "status": game.status.value,
+        "image": game.image,
+    }
+
+
+def operation_to_dict(operation: GameOperation) -> dict:
+    return {
+        "operation_id": operation.id,
+        "game_id": operation.game_id,
+        "action": operation.action.value,
+        "status": operation.status.value,
+        "attempts": operation.attempts,
+        "error": operation.error,
+    }
+
+
+def default_container_name(path: str) -> str:
+    """www 폴더면 상위 폴더 이름, 압축 파일이면 파일 이름을 사용"""
+    path = path.rstrip(os.sep)
+    if archive.is_archive(path):
+        return pathlib.Path(path).stem
+    if path.endswith("www"):
+        return path.split(os.sep)[-2]
+    return path.split(os.sep)[-1]
+
+
+def list_games(offset: int = 0, limit: int = 50) -> tuple[list[Game], int]:
+    if offset < 0 or not 0 < limit <= MAX_PAGE_SIZE:
+        raise ServiceError(f"offset은 0 이상, limit은 1~{MAX_PAGE_SIZE}이어야 합니다.")
+    with rx.session() as session:
+        total = session.exec(
+            sqlmodel.select(sqlmodel.func.count()).select_from(Game)
+        ).one()
+        games = session.exec(
+            Game.select().order_by(Game.id).offset(offset).limit(limit)
+        ).all()
+        return [*games], total
+
+
+def validate_dir(dir: str):
+    if not os.path.isabs(dir):
+        # 상대 경로는 docker -v에서 named volume으로 해석된다
+        raise ServiceError(f"절대 경로가 필요합니다: {dir}")
+    if archive.is_archive(dir):
+        # 압축 파일은 풀지 않고 central directory만 읽어 확인
+        try:
+            archive.ZipIndex(dir).close()
+        except (zipfile.BadZipFile, ValueError, struct.error, OSError) as e:
+            raise ServiceError(f"{dir}: {e}")
+    # dir하위에 www폴더가 있는지 확인
+    elif not os.path.exists(os.path.join(dir, "index.html")):
+        raise ServiceError(f"'index.html' 파일이{dir}에 없습니다.")
+
+
+def add_game(
+    session: sqlmodel.Session, dir: str, container_name: str, image: str
+) -> Game:
+    """게임을 추가, 같은 경로가 이미 있으면 그 게임을 그대로 반환한다
+
+    cron에서 같은 add를 반복해도 게임이 늘어나지 않게 하고,
+    같은 컨테이너 이름을 쓰는 게임이 둘이 되어 서로 충돌하지 않도록 한다.
+    """
+    dir = os.path.normpath(dir)
+    if existing := session.exec(Game.select().where(Game.dir == dir)).first():
+        return existing
+    if session.exec(
+        Game.select().where(Game.container_name == container_name)
+    ).first():
+        raise ServiceError(f"이미 사용중인 컨테이너 이름입니다: {container_name}")
+    validate_dir(dir)
+    port = DEFAULT_PORT
+    if last_game := session.exec(Game.select().order_by(Game.port.desc())).first():
+        port = last_game.port + 1
+    game = Game(dir=dir, port=port, container_name=container_name, image=image)
+    session.add(game)
+    session.commit()
+    session.refresh(game)
+    return game
+
+
+def parse_game_item(item) -> tuple[str, str, str]:
+    """add_games 항목을 검사해 (dir, container_name, image)를 반환"""
+    if not isinstance(item, dict):
+        raise ServiceError("항목은 JSON 객체여야 합니다.")
+    dir = item.get("dir")
+    if not isinstance(dir, str) or not dir:
+        raise ServiceError("dir이 필요합니다.")
+    for field in ("container_name", "image"):
+        if not isinstance(item.get(field), (str, type(None))):
+            raise ServiceError(f"{field}는 문자열이어야 합니다.")
+    return (
+        dir,
+        item.get("container_name") or default_container_name(dir),
+        item.get("image") or DEFAULT_IMAGE,
+    )
+
+
+def add_games(items: list) -> list[dict]:
+    """여러 게임을 추가, 항목별로 성공하면 game, 실패하면 error를 담아 반환"""
+    results = []
+    with rx.session() as session:
+        for item in items:
+            dir = item.get("dir") if isinstance(item, dict) else None
+            try:
+                game = add_game(session, *parse_game_item(item))
+            except ServiceError as e:
+                results.append({"dir": dir, "error": str(e)})
+                continue
+            except Exception as e:
+                # 한 항목의 DB 오류가 나머지 항목에 영향을 주지 않도록
+                session.rollback()
+                results.append({"dir": dir, "error": f"{type(e).__name__}: {e}"})
+                continue
+            results.append({"dir": dir, "game": game_to_dict(game)})
+    return results
+
+
+async def run_operations(
+    ids: list[int], action: OperationAction
+) -> AsyncIterator[dict]:
+    """작업을 큐에 넣고 등록 결과와 완료 결과를 순서대로 내보낸다"""
+    operation_ids = [
+        operation_queue.enqueue(id, action) for id in dict.fromkeys(ids)
+    ]
+    with rx.session() as session:
+        for operation_id in operation_ids:
+            if operation := session.get(GameOperation, operation_id):
+                yield operation_to_dict(operation)
+    for waiting in asyncio.as_completed(
+        [operation_queue.wait(operation_id) for operation_id in set(operation_ids)]
+    ):
+        if operation := await waiting:
+            yield operation_to_dict(operation)
+
+
+async def restore_archive_games():
+    """압축 파일 게임은 백엔드 안에서만 서비스되므로,
+    재시작 전에 실행중이던 게임을 다시 실행 큐에 넣는다
+
+    끝나지 않은 작업이 남은 게임은 operation_queue.resume이 처리하므로 건너뛴다.
+    """
+    with rx.session() as session:
+        games = session.exec(
+            Game.select().where(Game.status == GameStatus.RUNNING)
+        ).all()
+        busy = set(
+            session.exec(
+                sqlmodel.select(GameOperation.game_id).where(
+                    GameOperation.status.in_(  # type: ignore
+                        [OperationStatus.PENDING, OperationStatus.RUNNING]
+                    )
+                )
+            ).all()
+        )
+        ids = [
+            game.id
+            for game in games
+            if game.id and game.id not in busy and archive.is_archive(game.dir)
+        ]
+    for id in ids:
+        operation_queue.enqueue(id, OperationAction.RUN)
+
+
+def refresh_status(id: int, running: set[str] | None = None) -> dict | None:
+    with rx.session() as session:
+        game = session.get(Game, id)
+        if not game:
+            return None
+        container.refresh_status(session, game, running)
+        return game_to_dict(game)
+
+
+async def refresh_statuses() -> AsyncIterator[dict]:
+    """모든 게임의 실행 상태를 다시 확인하며 하나씩 내보낸다
+
+    docker ps는 한 번만 실행하고 모든 게임을 그 결과와 비교한다.
+    """
+    running = await asyncio.to_thread(container.running_containers)
+    with rx.session() as session:
+        ids = [game.id for game in session.exec(Game.select().order_by(Game.id))]
+    for id in ids:
+        if id and (game := await asyncio.to_thread(refresh_status, id, running)):
+            yield game
@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+import reflex as rx
+import sqlmodel
+
+from gamehost import container, operations
+from gamehost.database import (
+    Game,
+    GameOperation,
+    GameStatus,
+    OperationAction,
+    OperationStatus,
+)
+
+RUN = OperationAction.RUN
+STOP = OperationAction.STOP
+
+
+class FakeDocker:
+    """도커 대신 실행 상태와 호출 기록만 관리"""
+
+    def __init__(self):
+        self.running: dict[int, bool] = {}
+        self.calls: list[tuple[str, int]] = []
+        self.error: Exception | None = None
+
+    def is_running(self, game: Game, deadline: float | None = None) -> bool:
+        return self.running.get(game.id, False)
+
+    def run_container(self, session, game: Game, deadline: float | None = None):
+        self.calls.append(("run", game.id))
+        if self.error:
+            raise self.error
+        self.running[game.id] = True
+        game.status = GameStatus.RUNNING
+        session.add(game)
+        session.commit()
+
+    def stop_container(self, session, game: Game, deadline: float | None = None):
+        self.calls.append(("stop", game.id))
+        self.running[game.id] = False
+        game.status = GameStatus.STOPPED
+        session.add(game)
+        session.commit()
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = sqlmodel.create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(rx, "session", lambda: sqlmodel.Session(engine))
+    return engine
+
+
+@pytest.fixture
+def docker(monkeypatch):
+    docker = FakeDocker()
+    monkeypatch.setattr(container, "is_running", docker.is_running)
+    monkeypatch.setattr(container, "run_container", docker.run_container)
+    monkeypatch.setattr(container, "stop_container", docker.stop_container)
+    monkeypatch.setattr(operations, "RETRY_DELAY", 0)
+    return docker
+
+
+def add_game(engine, docker: FakeDocker, status: GameStatus) -> int:
+    with sqlmodel.Session(engine) as session:
+        game = Game(dir="/games/a", port=3000, container_name="a", status=status)
+        session.add(game)
+        session.commit()
+        session.refresh(game)
+        assert game.id is not None
+        docker.running[game.id] = status == GameStatus.RUNNING
+        return game.id
+
+
+def get_game(engine, game_id: int) -> Game:
+    with sqlmodel.Session(engine) as session:
+        game = session.get(Game, game_id)
+        assert game
+        return game
+
+
+def test_double_start_runs_once(engine, docker):
+    game_id = add_game(engine, docker, GameStatus.STOPPED)
+
+    async def main():
+        queue = operations.OperationQueue()
+        first = queue.enqueue(game_id, RUN)
+        assert queue.enqueue(game_id, RUN) == first
+        assert (await queue.wait(first)).status == OperationStatus.DONE
+        # 이미 실행중이면 다시 실행해도 컨테이너를 재시작하지 않는다
+        again = queue.enqueue(game_id, RUN)
+        assert again != first
+        assert (await queue.wait(again)).status == OperationStatus.DONE
+
+    asyncio.run(main())
+    assert docker.calls == [("run", game_id)]
+    assert get_game(engine, game_id).status == GameStatus.RUNNING
+
+
+def test_start_then_stop_on_stopped_game_does_nothing(engine, docker):
+    game_id = add_game(engine, docker, GameStatus.STOPPED)
+
+    async def main():
+        queue = operations.OperationQueue()
+        start = queue.enqueue(game_id, RUN)
+        stop = queue.enqueue(game_id, STOP)
+        start_operation = await queue.wait(start)
+        stop_operation = await queue.wait(stop)
+        assert start_operation.status == OperationStatus.CANCELLED
+        assert stop_operation.action == STOP
+        assert stop_operation.status == OperationStatus.DONE
+
+    asyncio.run(main())
+    assert docker.calls == []
+    assert get_game(engine, game_id).status == GameStatus.STOPPED
+
+
+def test_stop_wins_over_redundant_start(engine, docker):
+    game_id = add_game(engine, docker, GameStatus.RUNNING)
+
+    async def main():
+        queue = operations.OperationQueue()
+        start = queue.enqueue(game_id, RUN)
+        stop = queue.enqueue(game_id, STOP)
+        assert (await queue.wait(start)).status == OperationStatus.CANCELLED
+        stop_operation = await queue.wait(stop)
+        assert stop_operation.action == STOP
+        assert stop_operation.status == OperationStatus.DONE
+
+    asyncio.run(main())
+    assert docker.calls == [("stop", game_id)]
+    assert get_game(engine, game_id).status == GameStatus.STOPPED
+
+
+def test_resume_requeues_running_operation(engine, docker):
+    game_id = add_game(engine, docker, GameStatus.STOPPED)
+    with sqlmodel.Session(engine) as session:
+        operation = GameOperation(
+            game_id=game_id, action=RUN, status=OperationStatus.RUNNING
+        )
+        session.add(operation)
+        session.commit()
+        session.refresh(operation)
+        operation_id = operation.id
+    assert operation_id is not None
+
+    async def main():
+        queue = operations.OperationQueue()
+        await queue.resume()
+        resumed = await queue.wait(operation_id)
+        assert resumed.status == OperationStatus.DONE
+        assert resumed.attempts == 1
+
+    asyncio.run(main())
+    assert docker.calls == [("run", game_id)]
+
+
+def test_unexpected_error_fails_operation(engine, docker):
+    game_id = add_game(engine, docker, GameStatus.STOPPED)
+    docker.error = FileNotFoundError("docker")
+
+    async def main():
+        queue = operations.OperationQueue(max_attempts=2)
+        first = queue.enqueue(game_id, RUN)
+        failed = await queue.wait(first)
+        assert failed.status == OperationStatus.FAILED
+        assert failed.attempts == 2
+        # 실패한 작업으로 합쳐지지 않고 새 작업이 만들어진다
+        docker.error = None
+        retry = queue.enqueue(game_id, RUN)
+        assert retry != first
+        assert (await queue.wait(retry)).status == OperationStatus.DONE
+
+    asyncio.run(main())
+
+
+def test_finished_operations_are_pruned(engine, docker, monkeypatch):
+    monkeypatch.setattr(operations, "KEEP_FINISHED", 2)
+    game_id = add_game(engine, docker, GameStatus.STOPPED)
+
+    async def main():
+        queue = operations.OperationQueue()
+        for action in (RUN, STOP, RUN, STOP):
+            await queue.wait(queue.enqueue(game_id, action))
+
+    asyncio.run(main())
+    with sqlmodel.Session(engine) as session:
+        remaining = session.exec(GameOperation.select()).all()
+    assert len(remaining) == 2